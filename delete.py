@@ -5,13 +5,39 @@ Deletes all objects (images and folders) from a specified R2 bucket.
 
 Requirements:
 - pip install boto3
+- Optional: pip install aioboto3 (deletes on an asyncio client instead of threads)
 - Cloudflare R2 API credentials
 """
 
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import string
+import sys
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain, islice
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+
+# boto3 and botocore (and asyncio, only needed with aioboto3) are slow to
+# import, so _import_boto imports them once a client is actually created;
+# --help and configuration errors never pay for it.
+# Until then the exception names are empty tuples, which match nothing.
+boto3 = aioboto3 = asyncio = Config = AioConfig = None
+ClientError = NoCredentialsError = ()
+
+logger = logging.getLogger(__name__)
+
+# Writes queued log records to stdout; started by _setup_logging
+_log_listener = None
+
+# Per-thread DeleteObjects payload dicts, see R2BucketCleaner._delete_request
+_payload_buffers = threading.local()
 
 # =============================================================================
 # CONFIGURATION - UPDATE THESE VALUES WITH YOUR CLOUDFLARE R2 CREDENTIALS
@@ -24,8 +50,249 @@ CONFIG = {
 }
 # =============================================================================
 
+# Number of key ranges listed in parallel
+LIST_WORKERS = 16
+
+# Number of delete batches sent in parallel
+DELETE_WORKERS = 10
+
+# Maximum number of keys per DeleteObjects request (S3 limit)
+BATCH_SIZE = 1000
+
+# Number of delete batches in flight with the async client
+ASYNC_CONCURRENCY = 32
+
+# Settings shared by the threaded and the async client. Adaptive retries back
+# off on SlowDown/503 responses instead of a fixed delay between batches. The
+# connection pool is large enough for every listing worker plus every delete
+# worker (DELETE_WORKERS threads or ASYNC_CONCURRENCY coroutines) to hold its
+# own connection, and keepalive keeps those TLS connections warm.
+CLIENT_CONFIG = {
+    'retries': {'mode': 'adaptive', 'max_attempts': 10},
+    'max_pool_connections': LIST_WORKERS + max(DELETE_WORKERS, ASYNC_CONCURRENCY),
+    'tcp_keepalive': True,
+    'signature_version': 's3v4'
+}
+
+# Number of objects shown before asking for confirmation
+PREVIEW_SIZE = 10
+
+BYTES_TO_MB = 1 / (1024 * 1024)
+
+# Listing is split into key ranges at these characters. Every key falls in
+# exactly one range, so keys starting with other characters are still covered.
+SHARD_BOUNDARIES = string.digits + string.ascii_uppercase + string.ascii_lowercase
+
+# Number of shards the listing is split into when nothing else is known
+SHARD_COUNT = len(SHARD_BOUNDARIES) + 1
+
+
+def _import_boto():
+    """Import boto3, botocore and, if installed, aioboto3."""
+    global boto3, aioboto3, asyncio, Config, AioConfig, ClientError, NoCredentialsError
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import ClientError, NoCredentialsError
+
+    try:
+        # Optional: when installed, deletion runs on the asyncio client instead of threads
+        import aioboto3
+        from aiobotocore.config import AioConfig
+        import asyncio
+    except ImportError:
+        aioboto3 = None
+
+
+def _client_options() -> Dict:
+    """Return the client settings supported by the installed botocore."""
+    options = dict(CLIENT_CONFIG)
+    # botocore 1.36+ checksums every request body and validates every response
+    # by default. Limit that to the operations that require it, which also
+    # avoids the extra checksum headers R2 does not support.
+    if 'request_checksum_calculation' in Config.OPTION_DEFAULTS:
+        options['request_checksum_calculation'] = 'when_required'
+        options['response_checksum_validation'] = 'when_required'
+    return options
+
+
+def _make_client(client_args: Dict):
+    """Create the threaded S3 client, importing boto3 on first use."""
+    if boto3 is None:
+        _import_boto()
+    return boto3.client('s3', config=Config(**_client_options()), **client_args)
+
+
+def _setup_logging():
+    """
+    Log to stdout through a queue.
+
+    Delete workers only put records on the queue, and a single listener thread
+    writes them out, so workers never wait on the stdout lock.
+    """
+    global _log_listener
+    log_queue = queue.Queue()
+    _log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        handlers=[QueueHandler(log_queue)])
+    _log_listener.start()
+
+
+def _flush_logs():
+    """Write out all queued log records, e.g. before prompting on stdout."""
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener.start()
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """Split items into lists of at most size items (itertools.batched before 3.12)."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _positive_float(value: str) -> float:
+    """argparse type for options that must be greater than zero."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def _range_shards(prefix: str, count: int) -> List[Tuple]:
+    """
+    Split the keys under prefix into count key ranges at SHARD_BOUNDARIES.
+
+    Shard i covers the keys in (bounds[i], bounds[i + 1]], as
+    (prefix, start_after, stop_at) tuples.
+    """
+    step = len(SHARD_BOUNDARIES) / count
+    bounds = [None, *(prefix + SHARD_BOUNDARIES[int(i * step)] for i in range(1, count)), None]
+    return [(prefix, bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+class TokenBucket:
+    """Pace work to a steady rate, allowing bursts of up to one second's worth."""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Tokens added per second
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, count: int) -> float:
+        """Take count tokens and return how many seconds to wait before using them."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative; the debt is paid off by waiting
+            self.tokens -= count
+            return max(0.0, -self.tokens / self.rate)
+
+
+class Checkpoint:
+    """
+    Track the key up to which every matching object has been deleted.
+
+    Batches are numbered in key order. The checkpoint only moves past a batch
+    once it and every earlier batch succeeded, so resuming with
+    StartAfter=last_key never skips an object that is still in the bucket.
+    The file also records the prefix and mode, since the key is only valid for
+    the listing it was taken from.
+    """
+
+    def __init__(self, path: str, prefix: str = '', images_only: bool = False):
+        """
+        Args:
+            path: File the last deleted key is stored in
+            prefix: Prefix of the cleanup the checkpoint belongs to
+            images_only: Mode of the cleanup the checkpoint belongs to
+
+        Raises:
+            ValueError: If the file was written for another prefix or mode
+        """
+        self.path = path
+        self.prefix = prefix
+        self.images_only = images_only
+        self.last_key = None
+        self.blocked = False  # Set once a batch fails; the checkpoint stops there
+        self._next = 1
+        self._done = {}
+        self._last_added = None
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state['prefix'] != prefix or state['images_only'] != images_only:
+                raise ValueError(
+                    f"Checkpoint {path} belongs to another cleanup (prefix '{state['prefix']}', "
+                    f"images only: {state['images_only']}); use a different checkpoint file")
+            self.last_key = state['last_key']
+
+    def add_batch(self, batch: List[str]):
+        """
+        Check that batch continues the previous one in key order.
+
+        The checkpoint is only valid if every key below it was submitted before
+        it, so keys listed out of order (e.g. from parallel shards) are rejected.
+        """
+        previous = self._last_added if self._last_added is not None else self.last_key
+        if (previous is not None and batch[0] <= previous) or any(
+                a >= b for a, b in zip(batch, batch[1:])):
+            raise ValueError("Checkpointed deletion requires keys in ascending key order")
+        self._last_added = batch[-1]
+
+    def batch_done(self, number: int, last_key: str, ok: bool):
+        """Record the outcome of batch number, whose highest key is last_key."""
+        self._done[number] = last_key if ok else None
+        advanced = False
+        while not self.blocked and self._next in self._done:
+            key = self._done.pop(self._next)
+            if key is None:
+                self.blocked = True
+                break
+            self.last_key = key
+            self._next += 1
+            advanced = True
+
+        if advanced:
+            # Write to a temporary file first so a crash never leaves a partial key
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'prefix': self.prefix, 'images_only': self.images_only,
+                           'last_key': self.last_key}, f)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove the checkpoint file after a complete cleanup."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
 class R2BucketCleaner:
-    def __init__(self, account_id: str, access_key: str, secret_key: str, bucket_name: str):
+    # Common image formats, matched case-insensitively at the end of the key.
+    # re.ASCII keeps case folding to ASCII letters, as key.lower().endswith()
+    # did, so non-ASCII look-alikes such as '.\u017fvg' are not images.
+    # A tail-anchored search is as fast as a set lookup on the lowercased tail
+    # and faster than packing the tail into an int, so the regex is kept.
+    _IMG_RE = re.compile(
+        r'\.(?:jpe?g|png|gif|bmp|tiff?|webp|svg|ico|avif|heic|heif)\Z',
+        re.IGNORECASE | re.ASCII
+    )
+    # Length of the longest extension above ('.jpeg', '.tiff', ...); only this
+    # many characters at the end of a key can take part in a match
+    _IMG_TAIL = 5
+
+    def __init__(self, account_id: str, access_key: str, secret_key: str, bucket_name: str,
+                 verbose: bool = False, max_rate: Optional[float] = None):
         """
         Initialize the R2 bucket cleaner.
         
@@ -34,180 +301,560 @@ class R2BucketCleaner:
             access_key: R2 API access key
             secret_key: R2 API secret key
             bucket_name: Name of the bucket to clean
+            verbose: If True, request and print every deleted key
+            max_rate: Maximum objects deleted per second (None for no limit beyond
+                      the adaptive retries)
         """
         self.bucket_name = bucket_name
         self.account_id = account_id
+        self.verbose = verbose
+        self.rate_limiter = TokenBucket(max_rate) if max_rate else None
         
         # Configure R2 client
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=f'https://{account_id}.r2.cloudflarestorage.com',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name='auto'  # R2 uses 'auto' as region
-        )
+        self._client_args = {
+            'endpoint_url': f'https://{account_id}.r2.cloudflarestorage.com',
+            'aws_access_key_id': access_key,
+            'aws_secret_access_key': secret_key,
+            'region_name': 'auto'  # R2 uses 'auto' as region
+        }
+        self.s3_client = _make_client(self._client_args)
     
-    def list_all_objects(self) -> List[Dict]:
-        """List all objects in the bucket."""
-        print(f"📋 Listing all objects in bucket '{self.bucket_name}'...")
-        
-        objects = []
-        continuation_token = None
-        
+    def _list_params(self, start_after: Optional[str], prefix: str) -> Dict:
+        """Build the list_objects_v2 paginator arguments for one key range."""
+        params = {
+            'Bucket': self.bucket_name,
+            'PaginationConfig': {'PageSize': 1000}  # Maximum objects per request
+        }
+        if start_after is not None:
+            params['StartAfter'] = start_after
+        if prefix:
+            params['Prefix'] = prefix
+        return params
+
+    def _trim_page(self, contents: List[Dict], stop_at: Optional[str],
+                   images_only: bool) -> Tuple[List[Dict], bool]:
+        """
+        Keep the objects of a listed page that belong to the range and match the filter.
+
+        Returns the kept objects and whether the page went past the end of the range.
+        """
+        # Keys are returned in sorted order, so the range ends within this page
+        # exactly when its last key is past stop_at
+        past_end = stop_at is not None and bool(contents) and contents[-1]['Key'] > stop_at
+        if past_end:
+            contents = [obj for obj in contents if obj['Key'] <= stop_at]
+        if images_only:
+            contents = self.filter_images(contents)
+        return contents, past_end
+
+    def _project_page(self, contents: List[Dict]) -> Tuple[List[str], List[int]]:
+        """
+        Reduce a page of objects to its keys.
+
+        Returns the keys and the sizes of the first PREVIEW_SIZE objects, which
+        is all the preview needs.
+        """
+        return [obj['Key'] for obj in contents], [obj['Size'] for obj in contents[:PREVIEW_SIZE]]
+
+    def _iter_range(self, paginator, start_after: Optional[str], stop_at: Optional[str],
+                    images_only: bool, prefix: str = '') -> Iterator[Tuple[List[str], List[int]]]:
+        """
+        Yield the pages of matching keys in one key range of the bucket.
+
+        Pages are filtered and reduced to keys (see _project_page) by the
+        listing worker as they arrive, so only keys are handed to the consumer
+        and filtering overlaps with fetching the next page.
+
+        Args:
+            paginator: A list_objects_v2 paginator
+            start_after: Exclusive lower bound of the range (None for the start of the bucket)
+            stop_at: Inclusive upper bound of the range (None for the end of the bucket)
+            images_only: If True, keep only image files
+            prefix: Only list objects whose key starts with this prefix
+        """
+        for page in paginator.paginate(**self._list_params(start_after, prefix)):
+            contents, past_end = self._trim_page(page.get('Contents', []), stop_at, images_only)
+            if contents:
+                yield self._project_page(contents)
+            if past_end:
+                return
+
+    def _discovery_params(self, prefix: str) -> Dict:
+        """Build the list_objects_v2 arguments that list the top level of the bucket (or prefix)."""
+        params = {'Bucket': self.bucket_name, 'Delimiter': '/', 'MaxKeys': 1000}
+        if prefix:
+            params['Prefix'] = prefix
+        return params
+
+    def _plan_shards(self, page: Dict, prefix: str) -> Tuple[List[Dict], List[Tuple]]:
+        """
+        Split the listing into shards that can be listed in parallel.
+
+        If the top level (page, listed with Delimiter='/') does not fit in one
+        response, the bucket (or prefix) is split into SHARD_COUNT key ranges.
+        Otherwise the objects directly at the top level are already listed, and
+        the folders are shared out so there are about SHARD_COUNT shards: with
+        that many folders each one becomes a shard, with fewer each folder is
+        split into key ranges so a single large folder is still listed in parallel.
+
+        Returns the already listed objects and the shards as
+        (prefix, start_after, stop_at) tuples.
+        """
+        if page.get('IsTruncated'):
+            return [], _range_shards(prefix, SHARD_COUNT)
+
+        folders = [cp['Prefix'] for cp in page.get('CommonPrefixes', [])]
+        if len(folders) >= SHARD_COUNT:
+            return page.get('Contents', []), [(folder, None, None) for folder in folders]
+        ranges_per_folder = SHARD_COUNT // len(folders) if folders else 0
+        return page.get('Contents', []), [
+            shard for folder in folders for shard in _range_shards(folder, ranges_per_folder)
+        ]
+
+    def _iter_sharded(self, paginator, shards: List[Tuple],
+                      images_only: bool) -> Iterator[Tuple[List[str], List[int]]]:
+        """
+        Yield pages of matching keys from all shards, listed in parallel.
+
+        Each shard is listed by its own paginator and pages are handed over
+        through a bounded queue, so at most a few pages per worker are held
+        in memory.
+        """
+        pages = queue.Queue(maxsize=2 * LIST_WORKERS)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Give up once the consumer has stopped reading
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def list_shard(prefix: str, start_after: Optional[str], stop_at: Optional[str]):
+            # Shards still queued when the consumer stops must not send a request
+            if stop.is_set():
+                return
+            try:
+                for contents in self._iter_range(paginator, start_after, stop_at,
+                                                 images_only, prefix):
+                    if not put(contents):
+                        return
+                put(None)
+            except Exception as e:
+                put(e)
+
+        with ThreadPoolExecutor(max_workers=LIST_WORKERS) as executor:
+            for shard in shards:
+                executor.submit(list_shard, *shard)
+
+            try:
+                remaining = len(shards)
+                while remaining:
+                    item = pages.get()
+                    if item is None:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def iter_keys(self, prefix: str = '', images_only: bool = False,
+                  preview: Optional[List[Tuple[str, int]]] = None,
+                  start_after: Optional[str] = None, ordered: bool = False) -> Iterator[str]:
+        """
+        Stream the keys of matching objects, page by page as they are listed.
+
+        Top-level folders, or key ranges when there are none, are listed in
+        parallel, so keys are not yielded in key order. When ordered or when
+        resuming after start_after, a single paginator is used and keys stay in
+        key order.
+        Listing workers reduce each page to its keys, so the listed object
+        dicts never leave the worker.
+
+        Args:
+            prefix: Only list objects whose key starts with this prefix
+            images_only: If True, yield only image files
+            preview: If given, filled with (key, size) of the first PREVIEW_SIZE
+                     objects, in the same order as they are yielded
+            start_after: Only list objects whose key sorts after this key
+            ordered: If True, yield keys in key order (needed by checkpoints)
+        """
+        logger.info(f"📋 Listing all objects in bucket '{self.bucket_name}'...")
+
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        total = 0
+        self.listing_complete = False
+
         try:
-            while True:
-                # Prepare list_objects_v2 parameters
-                params = {
-                    'Bucket': self.bucket_name,
-                    'MaxKeys': 1000  # Maximum objects per request
-                }
-                
-                if continuation_token:
-                    params['ContinuationToken'] = continuation_token
-                
-                # List objects
-                response = self.s3_client.list_objects_v2(**params)
-                
-                # Add objects to our list
-                if 'Contents' in response:
-                    objects.extend(response['Contents'])
-                    print(f"   Found {len(response['Contents'])} objects in this batch...")
-                
-                # Check if there are more objects
-                if not response.get('IsTruncated', False):
-                    break
-                    
-                continuation_token = response.get('NextContinuationToken')
-                
+            if ordered or start_after is not None:
+                listed, shards = [], [(prefix, start_after, None)]
+            else:
+                listed, shards = self._plan_shards(
+                    self.s3_client.list_objects_v2(**self._discovery_params(prefix)), prefix)
+            if len(shards) > 1:
+                logger.info(f"   Listing {len(shards)} shards in parallel...")
+                pages = self._iter_sharded(paginator, shards, images_only)
+            elif shards:
+                shard_prefix, start_after, stop_at = shards[0]
+                pages = self._iter_range(paginator, start_after, stop_at, images_only, shard_prefix)
+            else:
+                pages = iter(())
+            listed = self._trim_page(listed, None, images_only)[0]
+            if listed:
+                pages = chain([self._project_page(listed)], pages)
+
+            for keys, sizes in pages:
+                total += len(keys)
+                if preview is not None and len(preview) < PREVIEW_SIZE:
+                    preview.extend(zip(keys[:PREVIEW_SIZE - len(preview)], sizes))
+                yield from keys
+
         except ClientError as e:
-            print(f"❌ Error listing objects: {e}")
-            return []
+            logger.error(f"❌ Error listing objects: {e}")
+            return
+
+        self.listing_complete = True
+        logger.info(f"✅ Listing finished: {total} matching objects found")
+
+    def _delete_request(self, keys: List[str], reuse_buffer: bool = False) -> Dict:
+        """
+        Build the Delete argument of a DeleteObjects request.
+
+        Args:
+            keys: Keys to delete, at most BATCH_SIZE
+            reuse_buffer: If True, fill this thread's preallocated {'Key': ...}
+                          dicts instead of allocating new ones. Only safe when
+                          the request is sent before the thread builds another.
+        """
+        if reuse_buffer:
+            buffer = getattr(_payload_buffers, 'objects', None)
+            if buffer is None:
+                buffer = _payload_buffers.objects = [{'Key': None} for _ in range(BATCH_SIZE)]
+            for obj, key in zip(buffer, keys):
+                obj['Key'] = key
+            objects = buffer[:len(keys)]
+        else:
+            objects = [{'Key': key} for key in keys]
+
+        return {
+            'Objects': objects,
+            'Quiet': not self.verbose  # Quiet responses only list failed keys
+        }
+
+    def _check_delete_response(self, response: Dict, count: int) -> bool:
+        """Report the outcome of a DeleteObjects request of count keys."""
+        # Check for errors
+        errors = response.get('Errors', [])
+        if errors:
+            logger.error(f"❌ Some deletions failed:")
+            for error in errors:
+                logger.error(f"   - {error['Key']}: {error['Message']}")
+            return False
         
-        print(f"✅ Total objects found: {len(objects)}")
-        return objects
-    
-    def delete_objects_batch(self, objects: List[Dict]) -> bool:
+        # Report successful deletions
+        logger.info(f"✅ Successfully deleted {count} objects")
+        if self.verbose:
+            for deleted in response.get('Deleted', []):
+                logger.info(f"   - {deleted['Key']}")
+            
+        return True
+
+    def delete_objects_batch(self, keys: List[str]) -> bool:
         """Delete objects in batches of 1000 (AWS S3 limit)."""
-        if not objects:
+        if not keys:
             return True
             
-        # Prepare delete request
-        delete_keys = [{'Key': obj['Key']} for obj in objects]
-        
         try:
+            # Each worker thread sends its request before building the next one,
+            # so its payload dicts can be reused across batches
             response = self.s3_client.delete_objects(
                 Bucket=self.bucket_name,
-                Delete={
-                    'Objects': delete_keys,
-                    'Quiet': False  # Set to True to suppress successful deletion output
-                }
+                Delete=self._delete_request(keys, reuse_buffer=True)
             )
-            
-            # Check for errors
-            if 'Errors' in response and response['Errors']:
-                print(f"❌ Some deletions failed:")
-                for error in response['Errors']:
-                    print(f"   - {error['Key']}: {error['Message']}")
-                return False
-            
-            # Report successful deletions
-            if 'Deleted' in response:
-                print(f"✅ Successfully deleted {len(response['Deleted'])} objects")
-                
-            return True
-            
         except ClientError as e:
-            print(f"❌ Error deleting batch: {e}")
+            logger.error(f"❌ Error deleting batch: {e}")
             return False
+
+        return self._check_delete_response(response, len(keys))
     
-    def filter_images(self, objects: List[Dict]) -> List[Dict]:
+    def filter_images(self, objects: Iterable[Dict]) -> List[Dict]:
         """Filter objects to include only common image formats."""
-        image_extensions = {
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif',
-            '.webp', '.svg', '.ico', '.avif', '.heic', '.heif'
-        }
-        
-        image_objects = []
-        for obj in objects:
-            key_lower = obj['Key'].lower()
-            if any(key_lower.endswith(ext) for ext in image_extensions):
-                image_objects.append(obj)
-        
-        print(f"🖼️  Found {len(image_objects)} image files out of {len(objects)} total objects")
-        return image_objects
+        # Start the search at the tail of the key rather than slicing or lowercasing it
+        pattern, tail = self._IMG_RE, self._IMG_TAIL
+        return [obj for obj in objects if pattern.search(obj['Key'], len(obj['Key']) - tail)]
     
-    def clean_bucket(self, images_only: bool = False, dry_run: bool = False):
+    def clean_bucket(self, images_only: bool = False, dry_run: bool = False,
+                     checkpoint_path: Optional[str] = None, prefix: str = ''):
         """
         Clean the bucket by deleting all objects or just images.
         
         Args:
             images_only: If True, delete only image files
             dry_run: If True, show what would be deleted without actually deleting
+            checkpoint_path: If given, record progress in this file and resume
+                             from it on the next run
+            prefix: Only delete objects whose key starts with this prefix. The
+                    prefix is applied by R2 when listing; the image filter still
+                    runs locally because listing cannot filter by suffix.
         """
-        print(f"🧹 Starting bucket cleanup for '{self.bucket_name}'")
-        print(f"   Mode: {'Images only' if images_only else 'All objects'}")
-        print(f"   Dry run: {'Yes' if dry_run else 'No'}")
-        print("-" * 50)
-        
-        # List all objects
-        all_objects = self.list_all_objects()
-        if not all_objects:
-            print("✅ Bucket is already empty or no objects found.")
-            return
-        
-        # Filter objects if needed
-        objects_to_delete = self.filter_images(all_objects) if images_only else all_objects
+        logger.info(f"🧹 Starting bucket cleanup for '{self.bucket_name}'")
+        logger.info(f"   Mode: {'Images only' if images_only else 'All objects'}")
+        if prefix:
+            logger.info(f"   Prefix: {prefix}")
+        logger.info(f"   Dry run: {'Yes' if dry_run else 'No'}")
+        logger.info("-" * 50)
         
-        if not objects_to_delete:
-            print("✅ No matching objects found to delete.")
-            return
+        checkpoint = None
+        if checkpoint_path:
+            try:
+                checkpoint = Checkpoint(checkpoint_path, prefix, images_only)
+            except ValueError as e:
+                logger.error(f"❌ {e}")
+                return
+        start_after = checkpoint.last_key if checkpoint else None
+        if start_after is not None:
+            logger.info(f"⏩ Resuming after checkpoint key '{start_after}'")
+
+        # Listing, filtering, preview and batching all share one pass over the stream.
+        # The async client lists the bucket again on its own, so for it the preview
+        # comes from a single paginator that sends no requests beyond the preview.
+        preview = []
+        relisted = aioboto3 is not None and not dry_run
+        keys = self.iter_keys(prefix=prefix, images_only=images_only, preview=preview,
+                              start_after=start_after, ordered=checkpoint is not None or relisted)
+        try:
+            first_keys = self._preview_and_confirm(keys, preview, dry_run)
+            if first_keys is None:
+                # Nothing left to delete after a resume, so the checkpoint is done too
+                if checkpoint and not dry_run and not preview and self.listing_complete:
+                    checkpoint.clear()
+                return
+
+            logger.info(f"\n🗑️  Starting deletion...")
+            if relisted:
+                keys.close()
+                total_deleted = asyncio.run(self._clean_async(images_only, checkpoint, prefix))
+            else:
+                total_deleted = self._delete_stream(chain(first_keys, keys), checkpoint)
+        finally:
+            keys.close()
+
+        if checkpoint:
+            if self.listing_complete and not checkpoint.blocked:
+                checkpoint.clear()
+            else:
+                logger.info("⚠️  Cleanup incomplete; rerun with the same checkpoint to resume.")
+
+        logger.info(f"\n✅ Cleanup completed! Deleted {total_deleted} objects.")
+
+    def _preview_and_confirm(self, keys: Iterator[str], preview: List[Tuple[str, int]],
+                             dry_run: bool) -> Optional[List[str]]:
+        """
+        Show the first objects of the stream and ask for confirmation.
+
+        Returns the keys taken from the stream if deletion should go ahead, otherwise None.
+        """
+        first_keys = list(islice(keys, PREVIEW_SIZE))
+        if not first_keys:
+            logger.info("✅ No matching objects found to delete.")
+            return None
         
         # Show what will be deleted
-        print(f"\n📋 Objects to delete ({len(objects_to_delete)}):")
-        for i, obj in enumerate(objects_to_delete[:10]):  # Show first 10
-            size_mb = obj['Size'] / (1024 * 1024)
-            print(f"   {i+1:3d}. {obj['Key']} ({size_mb:.2f} MB)")
-        
-        if len(objects_to_delete) > 10:
-            print(f"   ... and {len(objects_to_delete) - 10} more objects")
+        # Build the whole preview first so it is written in one go
+        lines = [f"\n📋 Objects to delete (first {len(preview)}):"]
+        lines.extend(f"   {i+1:3d}. {key} ({size * BYTES_TO_MB:.2f} MB)"
+                     for i, (key, size) in enumerate(preview))
+        logger.info("\n".join(lines))
         
         if dry_run:
-            print("\n🔍 DRY RUN: No objects were actually deleted.")
-            return
+            remaining = sum(1 for _ in keys)
+            if remaining:
+                logger.info(f"   ... and {remaining} more objects")
+            logger.info(f"\n🔍 DRY RUN: No objects were actually deleted ({len(first_keys) + remaining} matched).")
+            return None
         
         # Confirm deletion
-        print(f"\n⚠️  WARNING: This will permanently delete {len(objects_to_delete)} objects!")
+        logger.info(f"\n⚠️  WARNING: This will permanently delete ALL matching objects!")
+        _flush_logs()
         confirm = input("Type 'DELETE' to confirm: ").strip()
         
         if confirm != 'DELETE':
-            print("❌ Operation cancelled.")
-            return
-        
-        # Delete objects in batches
-        print(f"\n🗑️  Starting deletion...")
-        batch_size = 1000  # AWS S3 limit
+            logger.error("❌ Operation cancelled.")
+            return None
+
+        return first_keys
+
+    def _delete_stream(self, keys: Iterable[str], checkpoint: Optional[Checkpoint] = None) -> int:
+        """
+        Delete a stream of keys in batches as they are listed.
+
+        With a checkpoint the keys must arrive in key order, otherwise ValueError
+        is raised. Returns the number deleted.
+        """
         total_deleted = 0
-        
-        for i in range(0, len(objects_to_delete), batch_size):
-            batch = objects_to_delete[i:i + batch_size]
-            print(f"\n   Processing batch {i//batch_size + 1} ({len(batch)} objects)...")
-            
-            if self.delete_objects_batch(batch):
-                total_deleted += len(batch)
+
+        with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+            pending = {}
+
+            def collect(futures):
+                nonlocal total_deleted
+                for future in futures:
+                    number, size, last_key = pending.pop(future)
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        # e.g. a connection error after retries: fail this batch, not the cleanup
+                        logger.error(f"❌ Error deleting batch: {e}")
+                        ok = False
+                    if ok:
+                        total_deleted += size
+                    else:
+                        logger.error(f"❌ Failed to delete batch {number}")
+                    if checkpoint:
+                        checkpoint.batch_done(number, last_key, ok)
+
+            for number, batch in enumerate(_batched(keys, BATCH_SIZE), 1):
+                # Cap the batches in flight so listing cannot run far ahead of deletion
+                if len(pending) >= 2 * DELETE_WORKERS:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                if checkpoint:
+                    checkpoint.add_batch(batch)
+                if self.rate_limiter:
+                    time.sleep(self.rate_limiter.reserve(len(batch)))
+                future = executor.submit(self.delete_objects_batch, batch)
+                pending[future] = (number, len(batch), batch[-1])
+
+            collect(list(wait(pending).done))
+
+        return total_deleted
+
+    async def _alist_range(self, client, pages: 'asyncio.Queue', prefix: str,
+                           start_after: Optional[str], stop_at: Optional[str], images_only: bool):
+        """Async counterpart of _iter_range: put the pages of one key range on a queue."""
+        paginator = client.get_paginator('list_objects_v2')
+        async for page in paginator.paginate(**self._list_params(start_after, prefix)):
+            contents, past_end = self._trim_page(page.get('Contents', []), stop_at, images_only)
+            if contents:
+                await pages.put(self._project_page(contents)[0])
+            if past_end:
+                return
+
+    async def _adelete(self, client, keys: List[str]) -> bool:
+        """Async counterpart of delete_objects_batch."""
+        try:
+            response = await client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete=self._delete_request(keys)
+            )
+        except ClientError as e:
+            logger.error(f"❌ Error deleting batch: {e}")
+            return False
+
+        return self._check_delete_response(response, len(keys))
+
+    async def _clean_async(self, images_only: bool, checkpoint: Optional[Checkpoint] = None,
+                           prefix: str = '') -> int:
+        """
+        List and delete all matching objects with the aioboto3 client.
+
+        Up to LIST_WORKERS shards (see _plan_shards) are listed at once into a
+        bounded queue, and up to ASYNC_CONCURRENCY delete requests run at once on
+        the same event loop. With a checkpoint the bucket is listed in key order from the
+        checkpoint instead. Returns the number of deleted objects.
+        """
+        session = aioboto3.Session()
+        async with session.client('s3', config=AioConfig(**_client_options()),
+                                  **self._client_args) as client:
+            pages = asyncio.Queue(maxsize=2 * ASYNC_CONCURRENCY)
+            if checkpoint:
+                listed, shards = [], [(prefix, checkpoint.last_key, None)]
             else:
-                print(f"❌ Failed to delete batch {i//batch_size + 1}")
-            
-            # Small delay between batches to avoid rate limiting
-            if i + batch_size < len(objects_to_delete):
-                time.sleep(0.5)
-        
-        print(f"\n✅ Cleanup completed! Deleted {total_deleted} objects.")
+                listed, shards = self._plan_shards(
+                    await client.list_objects_v2(**self._discovery_params(prefix)), prefix)
+            listed = self._trim_page(listed, None, images_only)[0]
+            if listed:
+                await pages.put(self._project_page(listed)[0])
+            listing_slots = asyncio.Semaphore(LIST_WORKERS)
 
+            async def list_shard(shard):
+                async with listing_slots:
+                    await self._alist_range(client, pages, *shard, images_only)
+
+            listers = [asyncio.ensure_future(list_shard(shard)) for shard in shards]
+
+            async def finish_listing():
+                self.listing_complete = False
+                try:
+                    await asyncio.gather(*listers)
+                    self.listing_complete = True
+                except ClientError as e:
+                    logger.error(f"❌ Error listing objects: {e}")
+                finally:
+                    for lister in listers:
+                        lister.cancel()
+                    await pages.put(None)
+
+            listing = asyncio.ensure_future(finish_listing())
+            in_flight = asyncio.Semaphore(ASYNC_CONCURRENCY)
+            deletes = set()
+            total_deleted = 0
+            batch_number = 0
+
+            async def delete(number: int, batch: List[str]):
+                nonlocal total_deleted
+                try:
+                    ok = await self._adelete(client, batch)
+                except Exception as e:
+                    # Tasks are discarded once done, so nothing else would see this error
+                    logger.error(f"❌ Error deleting batch: {e}")
+                    ok = False
+                finally:
+                    in_flight.release()
+                if ok:
+                    total_deleted += len(batch)
+                else:
+                    logger.error(f"❌ Failed to delete batch {number}")
+                if checkpoint:
+                    checkpoint.batch_done(number, batch[-1], ok)
+
+            async def submit(batch: List[str]):
+                nonlocal batch_number
+                batch_number += 1
+                if checkpoint:
+                    checkpoint.add_batch(batch)
+                # Wait for a free slot so listing cannot run far ahead of deletion
+                await in_flight.acquire()
+                if self.rate_limiter:
+                    await asyncio.sleep(self.rate_limiter.reserve(len(batch)))
+                task = asyncio.ensure_future(delete(batch_number, batch))
+                deletes.add(task)
+                task.add_done_callback(deletes.discard)
+
+            buffer = []
+            while True:
+                keys = await pages.get()
+                if keys is None:
+                    break
+                buffer.extend(keys)
+                while len(buffer) >= BATCH_SIZE:
+                    await submit(buffer[:BATCH_SIZE])
+                    del buffer[:BATCH_SIZE]
+            if buffer:
+                await submit(buffer)
+
+            await listing
+            await asyncio.gather(*deletes)
+
+        return total_deleted
 
 def main():
     """Main function with command line argument support."""
-    import argparse
-    
     # Set up command line arguments
     parser = argparse.ArgumentParser(
         description='Delete objects from Cloudflare R2 bucket',
@@ -231,6 +878,14 @@ Examples:
     
     parser.add_argument('--images-only', action='store_true',
                        help='When used with --dry-run, show only images')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Print every deleted key')
+    parser.add_argument('--max-rate', type=_positive_float, default=None,
+                       help='Maximum objects deleted per second (default: no limit)')
+    parser.add_argument('--prefix', default='',
+                       help='Only delete objects whose key starts with this prefix (e.g. uploads/)')
+    parser.add_argument('--checkpoint', metavar='PATH',
+                       help='Record progress in PATH and resume from it if it exists')
     
     args = parser.parse_args()
     
@@ -252,28 +907,34 @@ Examples:
         print("- bucket_name: Name of the bucket to clean")
         return
     
+    _setup_logging()
     try:
         # Initialize cleaner
-        cleaner = R2BucketCleaner(**config)
+        cleaner = R2BucketCleaner(**config, verbose=args.verbose, max_rate=args.max_rate)
         
         # Determine what to do based on arguments
         if args.dry_run:
-            print("=== DRY RUN MODE ===")
+            logger.info("=== DRY RUN MODE ===")
             images_only = args.images_only
-            cleaner.clean_bucket(images_only=images_only, dry_run=True)
+            cleaner.clean_bucket(images_only=images_only, dry_run=True,
+                                 checkpoint_path=args.checkpoint, prefix=args.prefix)
         elif args.delete_all:
-            print("=== DELETE ALL MODE ===")
-            cleaner.clean_bucket(images_only=False, dry_run=False)
+            logger.info("=== DELETE ALL MODE ===")
+            cleaner.clean_bucket(images_only=False, dry_run=False,
+                                 checkpoint_path=args.checkpoint, prefix=args.prefix)
         elif args.delete_images:
-            print("=== DELETE IMAGES MODE ===")
-            cleaner.clean_bucket(images_only=True, dry_run=False)
+            logger.info("=== DELETE IMAGES MODE ===")
+            cleaner.clean_bucket(images_only=True, dry_run=False,
+                                 checkpoint_path=args.checkpoint, prefix=args.prefix)
         
     except NoCredentialsError:
-        print("❌ AWS credentials not found. Please check your access key and secret key.")
+        logger.error("❌ AWS credentials not found. Please check your access key and secret key.")
     except ClientError as e:
-        print(f"❌ AWS client error: {e}")
+        logger.error(f"❌ AWS client error: {e}")
     except Exception as e:
-        print(f"❌ Unexpected error: {e}")
+        logger.error(f"❌ Unexpected error: {e}")
+    finally:
+        _log_listener.stop()
 
 
 if __name__ == "__main__":